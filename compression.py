@@ -0,0 +1,69 @@
+import os
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip alone still covers every browser
+    brotli = None
+
+# JSON bodies smaller than this are not worth the CPU
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# Levels for responses compressed per request; static pages always use the maximum
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+
+COMPRESSIBLE_TYPES = ('application/json',)
+
+
+def accepted_encodings(accept_encoding):
+    """Codings the client accepts (q > 0), from an Accept-Encoding header"""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding, available=('br', 'gzip')):
+    """Best coding both sides support: brotli, then gzip, else None (identity)"""
+    accepted = accepted_encodings(accept_encoding)
+    for coding in available:
+        if coding == 'br' and brotli is None:
+            continue
+        if coding in accepted or '*' in accepted:
+            return coding
+    return None
+
+
+def compress(data, coding, static=False):
+    if coding == 'br':
+        return brotli.compress(data, quality=11 if static else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if static else GZIP_LEVEL, mtime=0)
+
+
+class PrecompressedPage:
+    """A page rendered once and kept in identity, gzip and brotli form, each with a strong ETag"""
+
+    def __init__(self, html, mimetype='text/html'):
+        self.mimetype = mimetype
+        body = html.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Strong validators must differ per content-coding
+        self.variants = {None: (body, f'"{digest}"')}
+        self.variants['gzip'] = (compress(body, 'gzip', static=True), f'"{digest}-gzip"')
+        if brotli is not None:
+            self.variants['br'] = (compress(body, 'br', static=True), f'"{digest}-br"')
+
+    def variant(self, accept_encoding):
+        """(coding, body, etag) for the client's Accept-Encoding"""
+        coding = choose_encoding(accept_encoding)
+        body, etag = self.variants[coding]
+        return coding, body, etag
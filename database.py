@@ -1,3 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from sqlalchemy.dialects import postgresql, sqlite
 
-db = SQLAlchemy()
\ No newline at end of file
+# Extensions are bound to the application in app.create_app()
+db = SQLAlchemy()
+migrate = Migrate()
+
+
+def upsert(model):
+    """INSERT for model that accepts on_conflict_do_update (SQLite and PostgreSQL share the syntax)"""
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(model)
@@ -0,0 +1,42 @@
+import os
+
+# Token budgets for the transcript part of each prompt, configurable per endpoint
+CONTEXT_BUDGETS = {
+    'debate': int(os.getenv("CONTEXT_BUDGET_DEBATE", "3000")),
+    'report': int(os.getenv("CONTEXT_BUDGET_REPORT", "24000")),
+    'schema': int(os.getenv("CONTEXT_BUDGET_SCHEMA", "12000")),
+}
+# Most recent turns that are always sent verbatim
+KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "6"))
+# Older turns are folded into the summary in batches of at least this many
+SUMMARY_BATCH = int(os.getenv("CONTEXT_SUMMARY_BATCH", "4"))
+
+SUMMARY_HEADER = "Summary of earlier turns:"
+RECENT_HEADER = "Latest turns:"
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for Gemini tokenizers)"""
+    return (len(text) + 3) // 4
+
+
+def fit_context(summary, lines, budget):
+    """Combine the rolling summary with as many of the newest transcript lines as fit the budget"""
+    header = f"{SUMMARY_HEADER}\n{summary}\n\n{RECENT_HEADER}\n" if summary else ""
+    used = estimate_tokens(header)
+    kept = []
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        # The latest line is always kept, even if it alone exceeds the budget
+        if kept and used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return header + "\n".join(reversed(kept))
+
+
+def needs_summary(transcript, turn_count, summarized_turns):
+    """True once enough unsummarized turns have piled up behind the verbatim window"""
+    if estimate_tokens(transcript) <= CONTEXT_BUDGETS['debate'] // 2:
+        return False
+    return turn_count - summarized_turns >= KEEP_TURNS + SUMMARY_BATCH
@@ -0,0 +1,280 @@
+"""Local stand-in for the Gemini API, for load tests, benchmarks and offline runs
+
+Serves generateContent and streamGenerateContent (SSE) with synthetic answers, or with
+answers recorded from the real API, after a configurable latency and with configurable
+error rates. Point the app at it with GEMINI_API_BASE:
+
+    python fake_gemini.py --port 5099 --latency-ms 800 --latency-sigma 0.4 --error-rate 0.01
+    GEMINI_API_BASE=http://localhost:5099/v1beta gunicorn wsgi:app
+
+Record real answers once, then replay them offline (unrecorded prompts fall back to
+synthetic answers):
+
+    GOOGLE_API_KEY=... python fake_gemini.py --record gemini.jsonl
+    python fake_gemini.py --replay gemini.jsonl --recorded-latency
+
+Synthetic answers follow generationConfig.responseSchema when one is sent, so structured
+output (report, quiz, roadmap, profile) validates just like real responses.
+"""
+if __name__ == '__main__':
+    # Every request sleeps; cooperative sockets and sleeps let one process hold thousands
+    from gevent import monkey
+    monkey.patch_all()
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+
+import requests
+from flask import Flask, Response, jsonify, request
+
+UPSTREAM_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+WORDS = ("argüman kanıt iddia karşı görüş sonuç neden örnek veri analiz tartışma bakış açısı "
+         "evidence claim rebuttal premise conclusion reasoning example counterpoint").split()
+
+app = Flask(__name__)
+app.config['FAKE_GEMINI'] = None
+_record_lock = threading.Lock()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv("FAKE_GEMINI_PORT", "5099")))
+    parser.add_argument('--latency-ms', type=float, default=float(os.getenv("FAKE_GEMINI_LATENCY_MS", "800")),
+                        help='Median time to a complete answer (stream: to the first chunk)')
+    parser.add_argument('--latency-sigma', type=float, default=float(os.getenv("FAKE_GEMINI_LATENCY_SIGMA", "0.4")),
+                        help='Spread of the log-normal latency distribution; 0 gives a fixed latency')
+    parser.add_argument('--chunk-delay-ms', type=float, default=40, help='Gap between streamed chunks')
+    parser.add_argument('--stream-chunks', type=int, default=8, help='Chunks per streamed answer')
+    parser.add_argument('--error-rate', type=float, default=float(os.getenv("FAKE_GEMINI_ERROR_RATE", "0")),
+                        help='Share of calls answered with 500/503')
+    parser.add_argument('--rate-limit-rate', type=float, default=float(os.getenv("FAKE_GEMINI_429_RATE", "0")),
+                        help='Share of calls answered with 429 and Retry-After')
+    parser.add_argument('--retry-after', type=int, default=2, help='Retry-After seconds sent with 429/503')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible latencies and errors')
+    parser.add_argument('--record', metavar='FILE',
+                        help='Proxy to the real API (GOOGLE_API_KEY) and append every answer to FILE')
+    parser.add_argument('--replay', metavar='FILE', help='Serve answers recorded with --record')
+    parser.add_argument('--recorded-latency', action='store_true',
+                        help='With --replay, wait as long as the real call took instead of sampling')
+    return parser.parse_args(argv)
+
+
+def request_key(model, payload):
+    """Identity of a call for record/replay: model, contents and generationConfig"""
+    raw = json.dumps({"model": model, "contents": payload.get("contents"),
+                      "generationConfig": payload.get("generationConfig") or {}},
+                     sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def load_recordings(path):
+    recordings = {}
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    recordings[entry["key"]] = entry
+    return recordings
+
+
+def prompt_text(payload):
+    return "\n".join(part.get("text", "") for content in payload.get("contents", [])
+                     for part in content.get("parts", []))
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def sample_schema(schema, rng):
+    """A random value matching a Gemini responseSchema"""
+    kind = schema.get("type")
+    if kind == "OBJECT":
+        return {name: sample_schema(child, rng) for name, child in schema.get("properties", {}).items()}
+    if kind == "ARRAY":
+        low = schema.get("minItems", 1)
+        high = schema.get("maxItems", max(low, 5))
+        return [sample_schema(schema["items"], rng) for _ in range(rng.randint(low, high))]
+    if kind == "INTEGER":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 10))
+    if kind == "NUMBER":
+        return rng.uniform(schema.get("minimum", 0), schema.get("maximum", 1))
+    if kind == "BOOLEAN":
+        return rng.random() < 0.5
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    return sentence(rng, rng.randint(4, 14))
+
+
+def synthetic_text(payload, rng):
+    config = payload.get("generationConfig") or {}
+    if config.get("responseSchema"):
+        return json.dumps(sample_schema(config["responseSchema"], rng), ensure_ascii=False)
+    if "mermaid" in prompt_text(payload).lower():
+        nodes = [f'N{i}["{sentence(rng, 3)}"]' for i in range(5)]
+        edges = [f"N{i} --> N{i + 1}" for i in range(4)]
+        return "```mermaid\ngraph TD\n" + "\n".join(nodes + edges) + "\n```"
+    return " ".join(sentence(rng) for _ in range(rng.randint(3, 6)))
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def generate_response(text, payload):
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                        "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": estimate_tokens(prompt_text(payload)),
+                          "candidatesTokenCount": estimate_tokens(text),
+                          "totalTokenCount": estimate_tokens(prompt_text(payload)) + estimate_tokens(text)},
+    }
+
+
+class FakeGemini:
+    """Answers, latencies and injected failures for the fake endpoints"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.recordings = load_recordings(args.replay)
+        self.stats = {"calls": 0, "replayed": 0, "synthetic": 0, "recorded": 0, "errors": 0, "rate_limited": 0}
+
+    def latency(self):
+        median = self.args.latency_ms / 1000
+        if self.args.latency_sigma <= 0:
+            return median
+        return self.rng.lognormvariate(0, self.args.latency_sigma) * median
+
+    def failure(self):
+        """An error response to send instead of an answer, or None"""
+        roll = self.rng.random()
+        headers = {'Retry-After': str(self.args.retry_after)}
+        if roll < self.args.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return error_response(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota).",
+                                  headers)
+        if roll < self.args.rate_limit_rate + self.args.error_rate:
+            self.stats["errors"] += 1
+            if self.rng.random() < 0.5:
+                return error_response(503, "UNAVAILABLE", "The model is overloaded. Please try again later.",
+                                      headers)
+            return error_response(500, "INTERNAL", "An internal error has occurred.")
+        return None
+
+    def answer(self, model, payload):
+        """(response body, seconds to wait before sending it)"""
+        self.stats["calls"] += 1
+        key = request_key(model, payload)
+        if self.args.record:
+            return self.record(model, payload, key), 0
+
+        recorded = self.recordings.get(key)
+        if recorded is not None:
+            self.stats["replayed"] += 1
+            wait = recorded["latency_ms"] / 1000 if self.args.recorded_latency else self.latency()
+            return recorded["response"], wait
+
+        self.stats["synthetic"] += 1
+        return generate_response(synthetic_text(payload, self.rng), payload), self.latency()
+
+    def record(self, model, payload, key):
+        """Ask the real API and append its answer to the recording file"""
+        started = time.perf_counter()
+        upstream = requests.post(f"{UPSTREAM_API_BASE}/models/{model}:generateContent", json=payload,
+                                 params={'key': os.environ["GOOGLE_API_KEY"]}, timeout=(5, 120))
+        upstream.raise_for_status()
+        body = upstream.json()
+        entry = {"key": key, "model": model, "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                 "request": payload, "response": body}
+        with _record_lock, open(self.args.record, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.recordings[key] = entry
+        self.stats["recorded"] += 1
+        return body
+
+
+def error_response(status, reason, message, headers=None):
+    body = {"error": {"code": status, "message": message, "status": reason}}
+    return Response(json.dumps(body), status=status, mimetype='application/json', headers=headers or {})
+
+
+def split_chunks(text, count):
+    size = max(1, -(-len(text) // max(count, 1)))
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+@app.route('/v1beta/models/<model>', methods=['GET'])
+def model_info(model):
+    # Used by GeminiClient.warm_up
+    return jsonify({"name": f"models/{model}", "displayName": model})
+
+
+@app.route('/v1beta/models/<model>:generateContent', methods=['POST'])
+def generate_content(model):
+    fake = app.config['FAKE_GEMINI']
+    failure = fake.failure()
+    if failure is not None:
+        time.sleep(fake.latency())
+        return failure
+    body, wait = fake.answer(model, request.get_json())
+    time.sleep(wait)
+    return jsonify(body)
+
+
+@app.route('/v1beta/models/<model>:streamGenerateContent', methods=['POST'])
+def stream_generate_content(model):
+    fake = app.config['FAKE_GEMINI']
+    payload = request.get_json()
+    failure = fake.failure()
+    if failure is not None:
+        time.sleep(fake.latency())
+        return failure
+
+    body, wait = fake.answer(model, payload)
+    candidate = body["candidates"][0]
+    text = "".join(part.get("text", "") for part in candidate["content"]["parts"])
+    chunk_delay = fake.args.chunk_delay_ms / 1000
+
+    def events():
+        # wait is the time to the first token; the rest arrives chunk by chunk
+        time.sleep(wait)
+        for i, chunk in enumerate(split_chunks(text, fake.args.stream_chunks)):
+            if i:
+                time.sleep(chunk_delay)
+            event = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}, "index": 0}],
+                     "usageMetadata": body.get("usageMetadata", {})}
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n"
+
+    return Response(events(), mimetype='text/event-stream')
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    return jsonify(app.config['FAKE_GEMINI'].stats)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.record and not os.getenv("GOOGLE_API_KEY"):
+        sys.exit("--record needs GOOGLE_API_KEY")
+    app.config['FAKE_GEMINI'] = FakeGemini(args)
+
+    from gevent.pywsgi import WSGIServer
+    print(f"Fake Gemini on http://{args.host}:{args.port}/v1beta  "
+          f"(latency {args.latency_ms:.0f} ms ±{args.latency_sigma}, errors {args.error_rate:.1%}, "
+          f"429s {args.rate_limit_rate:.1%}, {len(app.config['FAKE_GEMINI'].recordings)} recordings)")
+    WSGIServer((args.host, args.port), app, log=None).serve_forever()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Gunicorn settings for production: gunicorn wsgi:app
+
+Run `flask init-db` once before starting the workers; they never create tables themselves.
+
+Workers are gevent-based by default: sockets become cooperative, so the pooled
+requests session used for Gemini is non-blocking and every in-flight request costs a
+greenlet instead of an OS thread. One worker can then hold hundreds of upstream
+calls inside the container's 1 CPU / 512 MB.
+
+Every setting can be overridden from the environment:
+    WEB_CONCURRENCY         worker processes (default 2 x CPU cores + 1)
+    WEB_WORKER_CLASS        gevent (default) or gthread
+    WEB_WORKER_CONNECTIONS  concurrent requests per gevent worker
+    WEB_THREADS             threads per gthread worker
+    WEB_TIMEOUT             seconds before a silent worker is restarted (must exceed GEMINI_READ_TIMEOUT)
+    PORT                    listen port
+    PROMETHEUS_MULTIPROC_DIR  where workers write metric samples for /metrics (wiped at startup)
+"""
+import os
+import shutil
+import multiprocessing
+
+worker_class = os.getenv("WEB_WORKER_CLASS", "gevent")
+if worker_class == "gevent":
+    # Patch before the app is preloaded, otherwise ssl/requests keep blocking sockets
+    from gevent import monkey
+    monkey.patch_all()
+
+# Must be set before prometheus_client is imported by the preloaded app. Each worker
+# writes its own files here and /metrics sums them, whichever worker serves the scrape.
+metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+worker_connections = int(os.getenv("WEB_WORKER_CONNECTIONS", "500"))
+threads = int(os.getenv("WEB_THREADS", "8"))
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app once in the master and fork workers from it: faster startup, shared
+# memory pages, and one SECRET_KEY for all workers when none is configured
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened before the fork must not be shared between processes
+    from wsgi import app
+    from database import db
+    from gemini_client import gemini
+
+    with app.app_context():
+        db.engine.dispose()
+    gemini.close()
+    gemini.warm_up()
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges; its counters and histograms keep counting
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
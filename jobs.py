@@ -0,0 +1,105 @@
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import JOB_QUEUE_PENDING
+from request_timing import propagate
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "50"))
+
+TERMINAL_STATUSES = ('done', 'failed')
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue already holds JOB_QUEUE_MAX pending jobs"""
+
+
+class JobQueue:
+    """Local worker pool for slow LLM generations whose state lives in the Job table
+
+    Jobs are executed in this process, but status and results are read from the
+    database, so any worker can answer a poll for a job another worker ran.
+    """
+
+    def __init__(self, db, model, workers=JOB_WORKERS, max_pending=JOB_QUEUE_MAX):
+        self.app = None
+        self.db = db
+        self.model = model
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._pending = 0
+        self._changed = threading.Condition()
+
+    def init_app(self, app):
+        self.app = app
+
+    def submit(self, kind, fn, *args, user_id=None):
+        """Persist a queued job and schedule fn(*args) on the pool; returns the job id"""
+        with self._changed:
+            if self._pending >= self.max_pending:
+                raise QueueFullError("Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.")
+            self._pending += 1
+        JOB_QUEUE_PENDING.inc()
+
+        try:
+            job = self.model(id=uuid.uuid4().hex, kind=kind, user_id=user_id, status='queued')
+            self.db.session.add(job)
+            self.db.session.commit()
+            # propagate: the job's Gemini calls are charged to the submitting caller's fair share
+            self._executor.submit(propagate(self._run), job.id, fn, args)
+        except Exception:
+            with self._changed:
+                self._pending -= 1
+            JOB_QUEUE_PENDING.dec()
+            raise
+        return job.id
+
+    def _run(self, job_id, fn, args):
+        with self.app.app_context():
+            try:
+                self._update(job_id, status='running')
+                try:
+                    result = fn(*args)
+                except Exception as e:
+                    print(f"Job {job_id} error: {e}")
+                    self.db.session.rollback()
+                    self._update(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+                else:
+                    self._update(job_id, status='done', result=json.dumps(result), finished_at=datetime.utcnow())
+            finally:
+                with self._changed:
+                    self._pending -= 1
+                    self._changed.notify_all()
+                JOB_QUEUE_PENDING.dec()
+
+    def _update(self, job_id, **fields):
+        job = self.db.session.get(self.model, job_id)
+        for name, value in fields.items():
+            setattr(job, name, value)
+        self.db.session.commit()
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait(self, timeout):
+        """Block until some local job changes state or the timeout passes"""
+        with self._changed:
+            self._changed.wait(timeout)
+
+
+def serialize_job(job):
+    data = {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == 'done':
+        data["result"] = json.loads(job.result)
+    elif job.status == 'failed':
+        data["error"] = job.error
+    return data
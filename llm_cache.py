@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+# Expired rows are only skipped on read; every this many writes a worker deletes them
+CACHE_PURGE_EVERY = int(os.getenv("LLM_CACHE_PURGE_EVERY", "500"))
+CACHE_DB = os.getenv("LLM_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   'instance', 'llm_cache.db'))
+
+
+def cache_key(model, prompt, generation_config=None):
+    """Content address of a request: sha256 over (model, prompt, generationConfig)"""
+    raw = json.dumps({"model": model, "prompt": prompt, "generationConfig": generation_config or {}},
+                     sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """Two-tier response cache: a bounded in-process LRU in front of a shared SQLite table"""
+
+    def __init__(self, path=CACHE_DB, max_entries=CACHE_SIZE, ttl=CACHE_TTL, purge_every=CACHE_PURGE_EVERY):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache ("
+                         "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+            return self.stats[name]
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("LLM cache read failed: %s", e)
+            row = None
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        self._count("disk_hits")
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                             (key, value, expires_at))
+        except sqlite3.Error as e:
+            logger.warning("LLM cache write failed: %s", e)
+        if self.purge_every and self._count("writes") % self.purge_every == 0:
+            try:
+                self.purge_expired()
+            except sqlite3.Error as e:
+                logger.warning("LLM cache purge failed: %s", e)
+
+    def purge_expired(self):
+        """Drop expired rows from the persistent tier"""
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0
+        return stats
+
+
+llm_cache = LLMCache() if CACHE_ENABLED else None
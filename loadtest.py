@@ -0,0 +1,237 @@
+"""End-to-end load test: concurrent users walking the debate -> report -> history -> quiz -> learning path journey
+
+Each virtual user registers, logs in and then repeats the journey:
+
+    debate session + N turns -> finalize (report + argument map) -> history -> profile
+    -> learning topics -> quiz -> quiz result -> learning path -> learning path list
+
+and the run ends with throughput and p50/p95/p99 latency per route. Run it against
+an app that talks to fake_gemini.py so results do not depend on (or pay for) the real API:
+
+    python fake_gemini.py --latency-ms 800 &
+    GEMINI_API_BASE=http://localhost:5099/v1beta gunicorn wsgi:app &
+    python loadtest.py --users 50 --duration 120
+    python loadtest.py --users 20 --journeys 3 --stream --json results.json
+
+Requests answered 429/503 with Retry-After are retried like a browser client would;
+every attempt is counted.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ARGUMENTS = [
+    "Bu görüşü destekliyorum çünkü verilere göre sonuçlar açıkça olumlu.",
+    "Karşı tarafın iddiası kanıtlarla desteklenmiyor, örnekler tek taraflı.",
+    "Uzun vadede maliyetler faydalardan daha ağır basacaktır.",
+    "Benzer uygulamalar başka ülkelerde başarılı oldu, bu da bir emsal.",
+    "Bu argüman önemli bir noktayı gözden kaçırıyor: etik boyut.",
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5001')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--journeys', type=int, default=1, help='Journeys per user (ignored with --duration)')
+    parser.add_argument('--duration', type=float, help='Keep starting journeys for this many seconds')
+    parser.add_argument('--turns', type=int, default=3, help='Debate turns per journey')
+    parser.add_argument('--stream', action='store_true', help='Use the streaming debate-turn endpoint')
+    parser.add_argument('--lang', default='tr', choices=['tr', 'en'])
+    parser.add_argument('--think-ms', type=float, default=0, help='Pause between steps, like a user reading')
+    parser.add_argument('--max-retries', type=int, default=5, help='Retries for 429/503 with Retry-After')
+    parser.add_argument('--timeout', type=float, default=180)
+    parser.add_argument('--json', metavar='FILE', help='Also write the results as JSON')
+    return parser.parse_args(argv)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class JourneyFailed(Exception):
+    """A step the rest of the journey depends on did not succeed"""
+
+
+class Recorder:
+    """Latency samples and error counts per route"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.journeys = {"completed": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def add(self, route, seconds, status, ok):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route][str(status or 'connection')] += 1
+
+    def journey(self, ok):
+        with self._lock:
+            self.journeys["completed" if ok else "failed"] += 1
+
+    def summary(self, elapsed):
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(values),
+                "errors": sum(self.errors[route].values()),
+                "error_statuses": dict(self.errors[route]),
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 2),
+                "journeys": dict(self.journeys), "journeys_per_s": round(self.journeys["completed"] / elapsed, 3),
+                "routes": routes}
+
+
+class VirtualUser:
+    """One browser: its own cookie jar and keep-alive connections"""
+
+    def __init__(self, args, recorder, user_id):
+        self.args = args
+        self.recorder = recorder
+        self.username = f"load-{int(time.time())}-{user_id}-{random.randrange(10 ** 6)}"
+        self.password = "load-test-password"
+        self.http = requests.Session()
+        self.http.mount('http://', HTTPAdapter(pool_maxsize=2))
+        self.http.mount('https://', HTTPAdapter(pool_maxsize=2))
+        self.rng = random.Random(user_id)
+
+    def call(self, method, route, path=None, expect=(200, 201, 202), **kwargs):
+        """Send a request, record it under route, retry on Retry-After; returns the response"""
+        url = self.args.base_url.rstrip('/') + (path or route)
+        for attempt in range(self.args.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.http.request(method, url, timeout=self.args.timeout, **kwargs)
+                if kwargs.get('stream'):
+                    for _ in response.iter_lines():
+                        pass
+            except requests.RequestException:
+                self.recorder.add(route, time.perf_counter() - started, None, False)
+                raise JourneyFailed(f"{method} {route}: connection error")
+            self.recorder.add(route, time.perf_counter() - started, response.status_code,
+                              response.status_code in expect)
+            retry_after = response.headers.get('Retry-After')
+            if response.status_code in (429, 503) and retry_after and attempt < self.args.max_retries:
+                time.sleep(float(retry_after))
+                continue
+            break
+        if response.status_code not in expect:
+            raise JourneyFailed(f"{method} {route}: HTTP {response.status_code}")
+        return response
+
+    def think(self):
+        if self.args.think_ms:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.args.think_ms / 1000)
+
+    def sign_up(self):
+        credentials = {'username': self.username, 'password': self.password}
+        self.call('POST', '/api/register', json=credentials)
+        self.call('POST', '/api/login', json=credentials)
+
+    def journey(self):
+        lang = self.args.lang
+        created = self.call('POST', '/api/debate/sessions', json={
+            'topic': self.rng.choice(["Yapay zeka işsizliği artırır", "Uzaktan çalışma verimlidir",
+                                      "Sosyal medya demokrasiye zarar verir"]),
+            'stance': self.rng.choice(['savunuyorum', 'karşıyım']), 'lang': lang}).json()
+        session_path = f"/api/debate/sessions/{created['id']}"
+        for _ in range(self.args.turns):
+            self.think()
+            body = {'text': self.rng.choice(ARGUMENTS)}
+            if self.args.stream:
+                self.call('POST', '/api/debate/sessions/<id>/turns/stream', f"{session_path}/turns/stream",
+                          json=body, stream=True)
+            else:
+                self.call('POST', '/api/debate/sessions/<id>/turns', f"{session_path}/turns", json=body)
+
+        self.think()
+        self.call('POST', '/api/debate/sessions/<id>/finalize', f"{session_path}/finalize")
+        self.call('GET', '/api/history')
+        # 400 until the user has finished three debates
+        self.call('GET', '/api/profile', expect=(200, 400))
+
+        self.think()
+        topics = self.call('GET', '/api/learning-topics').json()
+        if not topics:
+            raise JourneyFailed("no learning topics; run flask init-db")
+        topic_id = self.rng.choice(topics)['id']
+        quiz = self.call('POST', '/api/quiz/<topic_id>', f"/api/quiz/{topic_id}", json={'lang': lang}).json()
+        score = sum(self.rng.random() < 0.6 for _ in quiz.get('questions', []))
+        level = self.call('POST', '/api/quiz-result', json={'topic_id': topic_id, 'score': score}).json()['level']
+
+        self.think()
+        self.call('POST', '/api/learning-path/<topic_id>', f"/api/learning-path/{topic_id}",
+                  json={'level': level, 'lang': lang})
+        self.call('GET', '/api/learning-paths')
+
+    def run(self, deadline):
+        try:
+            self.sign_up()
+        except JourneyFailed as e:
+            print(f"  {self.username}: sign-up failed ({e})", file=sys.stderr)
+            self.recorder.journey(False)
+            return
+        done = 0
+        while (time.monotonic() < deadline) if deadline else (done < self.args.journeys):
+            try:
+                self.journey()
+                self.recorder.journey(True)
+            except JourneyFailed as e:
+                print(f"  {self.username}: {e}", file=sys.stderr)
+                self.recorder.journey(False)
+            done += 1
+
+
+def print_summary(summary):
+    print(f"\n{'route':<44} {'reqs':>6} {'errs':>5} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, row in summary["routes"].items():
+        print(f"{route:<44} {row['requests']:>6} {row['errors']:>5} {row['rps']:>7.2f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    journeys = summary["journeys"]
+    print(f"\n{summary['requests']} requests in {summary['elapsed_s']} s ({summary['rps']} req/s); "
+          f"journeys: {journeys['completed']} completed, {journeys['failed']} failed "
+          f"({summary['journeys_per_s']}/s)")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    recorder = Recorder()
+    users = [VirtualUser(args, recorder, i) for i in range(args.users)]
+
+    print(f"{args.users} users against {args.base_url}"
+          + (f" for {args.duration:.0f} s" if args.duration else f", {args.journeys} journey(s) each")
+          + f", {args.turns} {'streamed ' if args.stream else ''}turns per debate")
+    started = time.perf_counter()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    summary = recorder.summary(time.perf_counter() - started)
+
+    print_summary(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(summary, config=vars(args)), f, indent=2)
+    return 1 if summary["journeys"]["completed"] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Prometheus metrics for HTTP routes, Gemini calls and database queries
+
+Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py) and every
+worker writes its samples there, so /metrics reports the sum over all workers.
+"""
+import os
+import time
+
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST,
+                               REGISTRY, generate_latest, multiprocess)
+from sqlalchemy import event
+
+from request_timing import record
+
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60, 120)
+
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to build the response, per route',
+    ['method', 'route', 'status'])
+HTTP_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled', multiprocess_mode='livesum')
+
+GEMINI_LATENCY = Histogram(
+    'gemini_request_duration_seconds',
+    'Gemini call duration per prompt type, including rate-limit waits and retries (streams: until the last chunk)',
+    ['kind', 'model'], buckets=LLM_BUCKETS)
+GEMINI_ERRORS = Counter(
+    'gemini_errors_total', 'Failed Gemini calls per prompt type and error class', ['kind', 'error'])
+GEMINI_RETRIES = Counter(
+    'gemini_retries_total', 'Gemini attempts retried, per prompt type and cause (HTTP status or connection)',
+    ['kind', 'reason'])
+GEMINI_RATE_LIMIT_WAIT = Histogram(
+    'gemini_rate_limit_wait_seconds', 'Time calls waited for an outbound rate-limit token', ['priority'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60, 120))
+GEMINI_HEDGES = Counter(
+    'gemini_hedged_requests_total', 'Second attempts sent for slow calls, and how many of them answered first',
+    ['kind', 'outcome'])
+GEMINI_FALLBACKS = Counter(
+    'gemini_fallback_calls_total', 'Calls sent to the fallback model while the primary circuit was open',
+    ['kind', 'model'])
+GEMINI_BREAKER_STATE = Gauge(
+    'gemini_circuit_state', 'Circuit breaker state per model (0 closed, 1 half-open, 2 open), worst worker',
+    ['model'], multiprocess_mode='livemax')
+GEMINI_TOKENS = Counter(
+    'gemini_tokens_total', 'Tokens reported in usageMetadata', ['kind', 'model', 'type'])
+GEMINI_IN_FLIGHT = Gauge(
+    'gemini_requests_in_flight', 'Gemini calls currently waiting on the API', ['kind'],
+    multiprocess_mode='livesum')
+
+JOB_QUEUE_PENDING = Gauge(
+    'job_queue_pending', 'Background jobs queued or running', multiprocess_mode='livesum')
+PASSWORD_HASH_PENDING = Gauge(
+    'password_hash_pending', 'Password hashes waiting for or running in the hashing pool',
+    multiprocess_mode='livesum')
+
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'SQL statement execution time', ['operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+
+
+def record_usage(kind, model, usage):
+    """Count prompt/response tokens from a Gemini usageMetadata block"""
+    if not usage:
+        return
+    for field, token_type in (('promptTokenCount', 'prompt'), ('candidatesTokenCount', 'response')):
+        if usage.get(field):
+            GEMINI_TOKENS.labels(kind, model, token_type).inc(usage[field])
+
+
+class track_gemini_call:
+    """Context manager timing one Gemini call and counting its failure, if any"""
+
+    def __init__(self, kind, model):
+        self.kind = kind
+        self.model = model
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        GEMINI_IN_FLIGHT.labels(self.kind).inc()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        GEMINI_IN_FLIGHT.labels(self.kind).dec()
+        GEMINI_LATENCY.labels(self.kind, self.model).observe(elapsed)
+        record('llm', elapsed)
+        if exc_type is not None and exc_type is not GeneratorExit:
+            GEMINI_ERRORS.labels(self.kind, exc_type.__name__).inc()
+        return False
+
+
+def install_db_metrics(engine):
+    """Time every statement executed through the engine"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+        if operation not in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+            operation = 'OTHER'
+        elapsed = time.perf_counter() - started
+        DB_QUERY_LATENCY.labels(operation).observe(elapsed)
+        record('db', elapsed)
+
+
+def install_http_metrics(app):
+    """Per-route latency histogram and in-flight gauge"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _observe(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else '<unmatched>'
+            HTTP_LATENCY.labels(request.method, route, str(response.status_code)).observe(
+                time.perf_counter() - started)
+        return response
+
+    @app.teardown_request
+    def _finish(exc):
+        HTTP_IN_FLIGHT.dec()
+
+
+def render_metrics():
+    """(body, content type) of the exposition, summed over workers in multiprocess mode"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
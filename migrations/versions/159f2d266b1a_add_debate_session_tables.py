@@ -0,0 +1,50 @@
+"""Add debate session and turn tables
+
+Revision ID: 159f2d266b1a
+Revises: 11f8368ee080
+Create Date: 2026-10-18 09:41:07.386925
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '159f2d266b1a'
+down_revision = '11f8368ee080'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('debate_session',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('topic', sa.String(length=200), nullable=False),
+    sa.Column('stance', sa.String(length=40), nullable=False),
+    sa.Column('lang', sa.String(length=5), nullable=False),
+    sa.Column('transcript', sa.Text(), nullable=False),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('summarized_turns', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('finalized_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('debate_turn',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=32), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('author', sa.String(length=10), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['debate_session.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('debate_turn')
+    op.drop_table('debate_session')
@@ -0,0 +1,33 @@
+"""Add task progress table
+
+Revision ID: 18d777052136
+Revises: cabd4ad20769
+Create Date: 2026-10-18 13:05:48.117903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '18d777052136'
+down_revision = 'cabd4ad20769'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing paths are seeded from their learning_path.progress blob in a279d612ef3f
+    op.create_table('task_progress',
+    sa.Column('learning_path_id', sa.Integer(), nullable=False),
+    sa.Column('section_index', sa.Integer(), nullable=False),
+    sa.Column('task_index', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['learning_path_id'], ['learning_path.id'], ),
+    sa.PrimaryKeyConstraint('learning_path_id', 'section_index', 'task_index')
+    )
+
+
+def downgrade():
+    op.drop_table('task_progress')
@@ -0,0 +1,39 @@
+"""Add debate score column
+
+Revision ID: 3f1c9a7d2b10
+Revises: 159f2d266b1a
+Create Date: 2026-10-18 10:12:41.208113
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b10'
+down_revision = '159f2d266b1a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('debate', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('score', sa.Integer(), nullable=True))
+
+    # Backfill the score from the stored report JSON so history pages need not parse it
+    conn = op.get_bind()
+    debate = sa.table('debate', sa.column('id', sa.Integer), sa.column('report_data', sa.Text),
+                      sa.column('score', sa.Integer))
+    for debate_id, report_data in conn.execute(sa.select(debate.c.id, debate.c.report_data)).fetchall():
+        try:
+            score = int(json.loads(report_data).get('iknaEdicilikPuani', 0))
+        except (TypeError, ValueError, AttributeError):
+            score = 0
+        conn.execute(debate.update().where(debate.c.id == debate_id).values(score=score))
+
+
+def downgrade():
+    with op.batch_alter_table('debate', schema=None) as batch_op:
+        batch_op.drop_column('score')
@@ -0,0 +1,30 @@
+"""Add login throttle table
+
+Revision ID: 6a636df1a252
+Revises: c5e1f27a9d44
+Create Date: 2026-10-18 16:14:26.055318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a636df1a252'
+down_revision = 'c5e1f27a9d44'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('login_throttle',
+    sa.Column('ip', sa.String(length=45), nullable=False),
+    sa.Column('failures', sa.Integer(), nullable=False),
+    sa.Column('window_started_at', sa.DateTime(), nullable=False),
+    sa.Column('blocked_until', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('ip')
+    )
+
+
+def downgrade():
+    op.drop_table('login_throttle')
@@ -0,0 +1,38 @@
+"""Add per-user lookup indexes
+
+Revision ID: 8b2e4d61c5a3
+Revises: 18d777052136
+Create Date: 2026-10-18 11:03:27.554190
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d61c5a3'
+down_revision = '18d777052136'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, unique) matching the query shapes in app.py
+INDEXES = [
+    ('ix_debate_user_timestamp', 'debate', ['user_id', 'timestamp', 'id'], False),
+    ('ix_question_topic_difficulty', 'question', ['topic_id', 'difficulty'], False),
+    ('ix_quiz_result_user_topic', 'quiz_result', ['user_id', 'topic_id', 'timestamp'], False),
+    ('ix_quiz_result_topic', 'quiz_result', ['topic_id'], False),
+    ('ix_learning_path_user_topic', 'learning_path', ['user_id', 'topic_id'], False),
+    ('ix_learning_path_topic', 'learning_path', ['topic_id'], False),
+    ('ix_debate_session_user', 'debate_session', ['user_id'], False),
+    ('ux_debate_turn_session_position', 'debate_turn', ['session_id', 'position'], True),
+    ('ux_roadmap_topic_level_lang_version', 'roadmap', ['topic_id', 'level', 'lang', 'version'], True),
+]
+
+
+def upgrade():
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, columns, unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,51 @@
+"""Backfill task progress for learning paths created before it
+
+Revision ID: a279d612ef3f
+Revises: 6a636df1a252
+Create Date: 2026-10-18 19:42:10.318254
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a279d612ef3f'
+down_revision = '6a636df1a252'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per roadmap task, carrying over the legacy progress blob. Only paths without
+    # any rows are touched, so this is safe on databases that were seeded lazily before.
+    conn = op.get_bind()
+    learning_path = sa.table('learning_path', sa.column('id', sa.Integer), sa.column('roadmap_data', sa.Text),
+                             sa.column('progress', sa.Text))
+    task_progress = sa.table('task_progress', sa.column('learning_path_id', sa.Integer),
+                             sa.column('section_index', sa.Integer), sa.column('task_index', sa.Integer),
+                             sa.column('completed', sa.Boolean), sa.column('updated_at', sa.DateTime))
+    seeded = sa.select(task_progress.c.learning_path_id).distinct()
+    paths = conn.execute(sa.select(learning_path).where(learning_path.c.id.not_in(seeded))).fetchall()
+
+    now = datetime.utcnow()
+    for path in paths:
+        roadmap = json.loads(path.roadmap_data or '{}')
+        legacy = json.loads(path.progress or '{}')
+        rows = []
+        for section_index, section in enumerate(roadmap.get('sections', [])):
+            done = legacy.get(str(section_index), {})
+            for task_index in range(len(section.get('tasks', []))):
+                rows.append({'learning_path_id': path.id, 'section_index': section_index, 'task_index': task_index,
+                             'completed': bool(done.get(str(task_index))) if isinstance(done, dict) else False,
+                             'updated_at': now})
+        if rows:
+            conn.execute(task_progress.insert(), rows)
+
+
+def downgrade():
+    # The rows are the only record of progress made since; keep them
+    pass
@@ -0,0 +1,64 @@
+"""Rebuild the pre-roadmap learning_path table
+
+Revision ID: afefba40f448
+Revises: ad848db8b841
+Create Date: 2026-10-18 09:12:03.448176
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'afefba40f448'
+down_revision = 'ad848db8b841'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases from before the roadmap tables still have the old learning_path layout
+    # (topic name, path_data, progress_data); ad848db8b841 was generated without it.
+    # Everything newer already has topic_id and is left alone.
+    conn = op.get_bind()
+    columns = {column['name'] for column in sa.inspect(conn).get_columns('learning_path')}
+    if 'topic_id' in columns:
+        return
+
+    legacy = sa.table('learning_path', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                      sa.column('topic', sa.String), sa.column('title', sa.String),
+                      sa.column('path_data', sa.Text), sa.column('progress_data', sa.Text),
+                      sa.column('created_at', sa.DateTime))
+    topic = sa.table('learning_topic', sa.column('id', sa.Integer), sa.column('name', sa.String),
+                     sa.column('description', sa.Text))
+    rows = conn.execute(sa.select(legacy)).fetchall()
+
+    op.drop_table('learning_path')
+    learning_path = op.create_table('learning_path',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('roadmap_data', sa.Text(), nullable=False),
+    sa.Column('progress', sa.Text(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['topic_id'], ['learning_topic.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    topic_ids = {name: topic_id for topic_id, name in conn.execute(sa.select(topic.c.id, topic.c.name))}
+    for row in rows:
+        if row.topic not in topic_ids:
+            conn.execute(topic.insert().values(name=row.topic, description=row.title or row.topic))
+            topic_ids[row.topic] = conn.execute(
+                sa.select(topic.c.id).where(topic.c.name == row.topic)).scalar()
+        conn.execute(learning_path.insert().values(
+            id=row.id, user_id=row.user_id, topic_id=topic_ids[row.topic], roadmap_data=row.path_data,
+            progress=row.progress_data or '{}', timestamp=row.created_at or datetime.utcnow()))
+
+
+def downgrade():
+    # The old layout is not restored; nothing reads it any more
+    pass
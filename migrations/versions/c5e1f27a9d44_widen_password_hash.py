@@ -0,0 +1,32 @@
+"""Widen user.password_hash for scrypt hashes
+
+Revision ID: c5e1f27a9d44
+Revises: 8b2e4d61c5a3
+Create Date: 2026-10-18 16:02:09.481736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1f27a9d44'
+down_revision = '8b2e4d61c5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=120),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=120),
+               existing_nullable=False)
@@ -0,0 +1,38 @@
+"""Add user stats table
+
+Revision ID: c9d86a34c402
+Revises: 3f1c9a7d2b10
+Create Date: 2026-10-18 10:38:15.902244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d86a34c402'
+down_revision = '3f1c9a7d2b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are built from the debate history on first use, so nothing to backfill here
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('debate_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Integer(), nullable=False),
+    sa.Column('score_histogram', sa.Text(), nullable=False),
+    sa.Column('fallacy_histogram', sa.Text(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('profile_data', sa.Text(), nullable=True),
+    sa.Column('profile_version', sa.Integer(), nullable=True),
+    sa.Column('profile_lang', sa.String(length=5), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
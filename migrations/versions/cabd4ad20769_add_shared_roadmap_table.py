@@ -0,0 +1,34 @@
+"""Add shared roadmap table
+
+Revision ID: cabd4ad20769
+Revises: c9d86a34c402
+Create Date: 2026-10-18 12:17:32.640581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cabd4ad20769'
+down_revision = 'c9d86a34c402'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('roadmap',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic_id', sa.Integer(), nullable=False),
+    sa.Column('level', sa.String(length=20), nullable=False),
+    sa.Column('lang', sa.String(length=5), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('roadmap_data', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['topic_id'], ['learning_topic.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('roadmap')
@@ -2,26 +2,50 @@ from database import db
 from datetime import datetime
 
 
-# Replace the existing model definitions in your app.py with these corrected versions
-
-# Database Models (corrected)
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     debates = db.relationship('Debate', backref='user', lazy=True)
     quiz_results = db.relationship('QuizResult', backref='user', lazy=True)
     learning_paths = db.relationship('LearningPath', backref='user', lazy=True)
 
 
+class LoginThrottle(db.Model):
+    """Failed login attempts per client IP within the current window"""
+    ip = db.Column(db.String(45), primary_key=True)
+    failures = db.Column(db.Integer, nullable=False, default=0)
+    window_started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    blocked_until = db.Column(db.DateTime)
+
+
 class Debate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     topic = db.Column(db.String(200), nullable=False)
     report_data = db.Column(db.Text, nullable=False)
     schema_data = db.Column(db.Text, nullable=False)
+    score = db.Column(db.Integer)  # iknaEdicilikPuani, copied out of report_data for list views
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (
+        # history pages: WHERE user_id = ? ORDER BY timestamp DESC, id DESC
+        db.Index('ix_debate_user_timestamp', 'user_id', 'timestamp', 'id'),
+    )
+
+
+class UserStats(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    debate_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    score_histogram = db.Column(db.Text, nullable=False, default='{}')  # JSON {score: count}
+    fallacy_histogram = db.Column(db.Text, nullable=False, default='{}')  # JSON {fallacy: count}
+    version = db.Column(db.Integer, nullable=False, default=0)  # bumped on every new debate
+    profile_data = db.Column(db.Text)  # JSON profile analysis computed at profile_version
+    profile_version = db.Column(db.Integer)
+    profile_lang = db.Column(db.String(5))
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 
 class LearningTopic(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -39,6 +63,10 @@ class Question(db.Model):
     difficulty = db.Column(db.String(20), nullable=False)
     explanation = db.Column(db.Text)
 
+    __table_args__ = (
+        db.Index('ix_question_topic_difficulty', 'topic_id', 'difficulty'),
+    )
+
 
 class QuizResult(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -48,48 +76,104 @@ class QuizResult(db.Model):
     level = db.Column(db.String(20), nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_quiz_result_user_topic', 'user_id', 'topic_id', 'timestamp'),
+        db.Index('ix_quiz_result_topic', 'topic_id'),
+    )
+
 
 class LearningPath(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     topic_id = db.Column(db.Integer, db.ForeignKey('learning_topic.id'), nullable=False)
     roadmap_data = db.Column(db.Text, nullable=False)  # JSON
-    progress = db.Column(db.Text, nullable=False, default='{}')  # JSON for task completion
+    # Legacy JSON blob of task completion; only read once to seed TaskProgress rows
+    progress = db.Column(db.Text, nullable=False, default='{}')
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_learning_path_user_topic', 'user_id', 'topic_id'),
+        db.Index('ix_learning_path_topic', 'topic_id'),
+    )
+
+    def _completion(self, *criteria):
+        total, completed = db.session.query(
+            db.func.count(), db.func.sum(db.cast(TaskProgress.completed, db.Integer))
+        ).filter(TaskProgress.learning_path_id == self.id, *criteria).one()
+        return (completed or 0) / total * 100 if total else 0
+
     def calculate_progress(self):
         """Calculate overall progress percentage for this learning path"""
-        import json
-        try:
-            path_data = json.loads(self.path_data)
-            progress_data = json.loads(self.progress_data) if self.progress_data else {}
+        return self._completion()
 
-            total_tasks = 0
-            completed_tasks = 0
+    def get_section_progress(self, section_index):
+        """Get progress for a specific section"""
+        return self._completion(TaskProgress.section_index == section_index)
 
-            for section_idx, section in enumerate(path_data.get('sections', [])):
-                section_tasks = len(section.get('tasks', []))
-                total_tasks += section_tasks
 
-                section_progress = progress_data.get(str(section_idx), {})
-                completed_tasks += sum(1 for task_completed in section_progress.values() if task_completed)
+class TaskProgress(db.Model):
+    """Completion state of a single roadmap task in a learning path"""
+    learning_path_id = db.Column(db.Integer, db.ForeignKey('learning_path.id'), primary_key=True)
+    section_index = db.Column(db.Integer, primary_key=True)
+    task_index = db.Column(db.Integer, primary_key=True)
+    completed = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
-            return (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        except:
-            return 0
 
-    def get_section_progress(self, section_index):
-        """Get progress for a specific section"""
-        import json
-        try:
-            path_data = json.loads(self.path_data)
-            progress_data = json.loads(self.progress_data) if self.progress_data else {}
+class Roadmap(db.Model):
+    """Roadmap shared by every user on the same topic/level/language"""
+    id = db.Column(db.Integer, primary_key=True)
+    topic_id = db.Column(db.Integer, db.ForeignKey('learning_topic.id'), nullable=False)
+    level = db.Column(db.String(20), nullable=False)
+    lang = db.Column(db.String(5), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    roadmap_data = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ux_roadmap_topic_level_lang_version', 'topic_id', 'level', 'lang', 'version', unique=True),
+    )
+
+
+class DebateSession(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    topic = db.Column(db.String(200), nullable=False)
+    stance = db.Column(db.String(40), nullable=False)
+    lang = db.Column(db.String(5), nullable=False, default='tr')
+    transcript = db.Column(db.Text, nullable=False, default='')  # rendered 'User:/AI Debater:' history
+    turn_count = db.Column(db.Integer, nullable=False, default=0)
+    summary = db.Column(db.Text)  # rolling summary of turns [0, summarized_turns)
+    summarized_turns = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finalized_at = db.Column(db.DateTime)
+    turns = db.relationship('DebateTurn', backref='debate_session', lazy=True, order_by='DebateTurn.position')
+
+    __table_args__ = (
+        db.Index('ix_debate_session_user', 'user_id'),
+    )
+
+
+class DebateTurn(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(32), db.ForeignKey('debate_session.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    author = db.Column(db.String(10), nullable=False)  # user|ai
+    text = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
-            section = path_data['sections'][section_index]
-            total_tasks = len(section.get('tasks', []))
+    __table_args__ = (
+        db.Index('ux_debate_turn_session_position', 'session_id', 'position', unique=True),
+    )
 
-            section_progress = progress_data.get(str(section_index), {})
-            completed_tasks = sum(1 for task_completed in section_progress.values() if task_completed)
 
-            return (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        except:
-            return 0
\ No newline at end of file
+class Job(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    kind = db.Column(db.String(40), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued|running|done|failed
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
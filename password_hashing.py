@@ -0,0 +1,92 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from metrics import PASSWORD_HASH_PENDING
+
+# Any Werkzeug method string, e.g. "pbkdf2:sha256:600000" or "scrypt:32768:8:1"
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+# Hashing processes per web worker; each one can keep a full CPU busy
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "1"))
+# Hashes allowed to wait for a free process before new logins are turned away
+HASH_QUEUE_MAX = int(os.getenv("HASH_QUEUE_MAX", "8"))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", "10"))
+# Hashing processes run at a lower priority so request handling wins the CPU
+HASH_WORKER_NICE = int(os.getenv("HASH_WORKER_NICE", "10"))
+
+
+class HashPoolBusyError(Exception):
+    """Raised when HASH_QUEUE_MAX hashes are already pending, or one waited longer than HASH_TIMEOUT"""
+
+
+def _lower_priority():
+    try:
+        os.nice(HASH_WORKER_NICE)
+    except OSError:
+        pass
+
+
+class PasswordHasher:
+    """Runs password hashing in a small process pool so it cannot starve request threads"""
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=HASH_WORKERS, max_pending=HASH_QUEUE_MAX,
+                 timeout=HASH_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._method_prefix = None
+
+    @property
+    def executor(self):
+        # Created on first use, so each forked web worker starts its own processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority)
+            return self._executor
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashPoolBusyError("Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.")
+            self._pending += 1
+        PASSWORD_HASH_PENDING.inc()
+        try:
+            future = self.executor.submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except TimeoutError:
+                # Still queued behind other hashes: drop it rather than hash for nobody
+                future.cancel()
+                raise HashPoolBusyError("Sunucu şu anda yoğun, lütfen biraz sonra tekrar deneyin.")
+        finally:
+            with self._lock:
+                self._pending -= 1
+            PASSWORD_HASH_PENDING.dec()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with a different method or cost than the configured one"""
+        if self._method_prefix is None:
+            # Werkzeug fills in defaults (e.g. "scrypt" -> "scrypt:32768:8:1"), so ask it once
+            self._method_prefix = self.hash('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,224 @@
+import os
+import time
+import random
+import sqlite3
+import logging
+import threading
+from contextvars import ContextVar
+
+from llm_cache import CACHE_DB
+from request_timing import propagate_var
+
+logger = logging.getLogger(__name__)
+
+# Buckets live next to the response cache so every worker on the host draws from the same quota
+LIMIT_DB = os.getenv("GEMINI_LIMIT_DB", CACHE_DB)
+# The API key's requests-per-minute quota; 0 disables outbound limiting
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+# Calls that may go out back to back after an idle period
+GEMINI_BURST = float(os.getenv("GEMINI_BURST", str(max(1.0, GEMINI_RPM / 6))))
+# Fair share: one user (or anonymous client IP) may not use more than this; 0 disables
+GEMINI_USER_RPM = float(os.getenv("GEMINI_USER_RPM", "0"))
+GEMINI_USER_BURST = float(os.getenv("GEMINI_USER_BURST", str(max(1.0, GEMINI_USER_RPM / 4))))
+# Share of the burst that background generation leaves untouched for interactive calls
+BACKGROUND_RESERVE = float(os.getenv("GEMINI_BACKGROUND_RESERVE", "0.3"))
+# Longest a call waits for tokens and retries before giving up, per priority class
+MAX_WAIT = {
+    'interactive': float(os.getenv("GEMINI_INTERACTIVE_MAX_WAIT", "15")),
+    'background': float(os.getenv("GEMINI_BACKGROUND_MAX_WAIT", "120")),
+}
+
+# Prompt kinds a user is actively waiting on; everything else is background work
+INTERACTIVE_KINDS = {'debate', 'report', 'schema', 'profile', 'other'}
+
+_caller = ContextVar('gemini_caller', default=None)
+# Report/schema fan-out threads draw from the same user's share
+propagate_var(_caller)
+
+
+def priority_for(kind):
+    return 'interactive' if kind in INTERACTIVE_KINDS else 'background'
+
+
+def set_caller(caller):
+    """Name whose fair share the Gemini calls of the current request draw from"""
+    _caller.set(None if caller is None else str(caller))
+
+
+def current_caller():
+    return _caller.get()
+
+
+def backoff_delay(attempt, retry_after=None, base=0.5, cap=20.0):
+    """Full-jitter exponential backoff; a Retry-After from the server is the minimum"""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        # Spread callers told the same Retry-After so they do not return together
+        delay = retry_after + random.uniform(0, base)
+    return delay
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds form); None if absent or a date"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no token frees up before the caller's wait budget runs out"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """Token buckets in a SQLite table shared by every worker on the host
+
+    A call takes one token from the global bucket (GEMINI_RPM) and one from its caller's
+    bucket (GEMINI_USER_RPM) in the same transaction. Background calls only take a global
+    token while BACKGROUND_RESERVE of the burst stays free, so interactive debate turns
+    still go out when generation jobs have drained the bucket. pause() empties the global
+    bucket until a 429's Retry-After has passed, for all workers at once.
+    """
+
+    def __init__(self, path=LIMIT_DB, rpm=GEMINI_RPM, burst=GEMINI_BURST, user_rpm=GEMINI_USER_RPM,
+                 user_burst=GEMINI_USER_BURST, reserve=BACKGROUND_RESERVE):
+        self.path = path
+        self.rate = rpm / 60
+        self.burst = burst
+        self.user_rate = user_rpm / 60
+        self.user_burst = user_burst
+        self.reserve = reserve
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"granted": 0, "waited": 0, "rejected": 0, "paused": 0}
+
+    @property
+    def enabled(self):
+        return self.rate > 0 or self.user_rate > 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_rate_bucket ("
+                         "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                         "paused_until REAL NOT NULL DEFAULT 0)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _level(row, rate, burst, now):
+        """Tokens in a bucket row after refilling up to now"""
+        if row is None:
+            return burst
+        tokens, updated_at, paused_until = row
+        if now < paused_until:
+            return min(tokens, 0.0)
+        return min(burst, tokens + (now - max(updated_at, paused_until)) * rate)
+
+    def _try_take(self, caller, priority):
+        """Take the tokens for one call; returns 0 on success, else seconds until they could be there"""
+        now = time.time()
+        buckets = []
+        if self.rate > 0:
+            floor = 1.0
+            if priority == 'background':
+                floor = max(1.0, min(self.burst, 1 + self.reserve * self.burst))
+            buckets.append(('global', self.rate, self.burst, floor))
+        if self.user_rate > 0 and caller is not None:
+            buckets.append((f'caller:{caller}', self.user_rate, self.user_burst, 1))
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels, wait = [], 0.0
+            for name, rate, burst, floor in buckets:
+                row = conn.execute("SELECT tokens, updated_at, paused_until FROM llm_rate_bucket WHERE name = ?",
+                                   (name,)).fetchone()
+                level = self._level(row, rate, burst, now)
+                levels.append(level)
+                if level < floor:
+                    paused = max(0.0, row[2] - now) if row is not None else 0.0
+                    wait = max(wait, paused + (floor - max(level, 0.0)) / rate)
+            if wait == 0:
+                for (name, _, _, _), level in zip(buckets, levels):
+                    conn.execute("INSERT INTO llm_rate_bucket (name, tokens, updated_at) VALUES (?, ?, ?) "
+                                 "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, "
+                                 "updated_at = excluded.updated_at",
+                                 (name, level - 1, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def acquire(self, kind='other', deadline=None):
+        """Block until the call may go out; RateLimitExceeded if that would be after deadline"""
+        if not self.enabled:
+            return 0.0
+        priority = priority_for(kind)
+        caller = current_caller()
+        if caller is not None and self.user_rate > 0 and random.random() < 0.001:
+            self.prune()
+        started = time.monotonic()
+        waited = False
+        while True:
+            try:
+                wait = self._try_take(caller, priority)
+            except sqlite3.Error as e:
+                # Without the shared table the upstream's own 429s still slow us down
+                logger.warning("Rate limiter unavailable: %s", e)
+                return time.monotonic() - started
+            if wait == 0:
+                self._count("granted")
+                return time.monotonic() - started
+            if deadline is not None and time.monotonic() + wait > deadline:
+                self._count("rejected")
+                raise RateLimitExceeded("Gemini kotası dolu, lütfen biraz sonra tekrar deneyin.", retry_after=wait)
+            if not waited:
+                waited = True
+                self._count("waited")
+            # Sleep in short slices so a token freed early is noticed by the first in line
+            time.sleep(min(wait, 1.0) * random.uniform(0.8, 1.0))
+
+    def pause(self, seconds):
+        """Stop every worker from calling for seconds (e.g. after a 429 Retry-After)"""
+        if self.rate <= 0 or seconds <= 0:
+            return
+        until = time.time() + seconds
+        try:
+            self._connection().execute(
+                "INSERT INTO llm_rate_bucket (name, tokens, updated_at, paused_until) VALUES ('global', 0, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET tokens = MIN(tokens, 0), "
+                "paused_until = MAX(paused_until, excluded.paused_until)",
+                (time.time(), until))
+            self._count("paused")
+        except sqlite3.Error as e:
+            logger.warning("Rate limiter pause failed: %s", e)
+
+    def prune(self, idle=3600):
+        """Drop per-user buckets unused for idle seconds (they would be full again anyway)"""
+        try:
+            self._connection().execute("DELETE FROM llm_rate_bucket WHERE name LIKE 'caller:%' AND updated_at < ?",
+                                       (time.time() - idle,))
+        except sqlite3.Error as e:
+            logger.warning("Rate limiter prune failed: %s", e)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update(rpm=self.rate * 60, burst=self.burst, user_rpm=self.user_rate * 60)
+        return stats
+
+
+gemini_limiter = TokenBucketLimiter()
@@ -0,0 +1,182 @@
+"""Per-request timing spans, reported in a Server-Timing header and one JSON log line per request
+
+Spans are summed per name (db, llm, parse, serialize, template, compress, commit, ...), so
+calls made concurrently by a fan-out can add up to more than the request's wall time.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from flask.json.provider import DefaultJSONProvider
+
+# Server-Timing is visible to browsers; turn it off if route internals should stay private
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+REQUEST_LOG = os.getenv("REQUEST_LOG", "1") == "1"
+
+logger = logging.getLogger(__name__)
+if REQUEST_LOG and not logger.handlers:
+    # One JSON object per line on stdout, next to gunicorn's access log
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current = ContextVar('request_timings', default=None)
+_render_started = ContextVar('render_started', default=None)
+# Request-scoped variables that propagate() hands over to executor threads
+_propagated = [_current]
+
+
+class RequestTimings:
+    """Spans recorded while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.status = None
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self.spans.get(name, (0.0, 0))
+            self.spans[name] = (total + seconds, count + 1)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value; total is the time until the headers were built"""
+        entries = [f'{name};dur={total * 1000:.2f};desc="{count}x"'
+                   for name, (total, count) in sorted(self.spans.items())]
+        entries.append(f'total;dur={self.elapsed() * 1000:.2f}')
+        return ', '.join(entries)
+
+    def as_dict(self):
+        with self._lock:
+            return {name: {"ms": round(total * 1000, 2), "count": count}
+                    for name, (total, count) in sorted(self.spans.items())}
+
+
+def record(name, seconds):
+    """Add a span to the current request, if there is one"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name):
+    """Time a block (or, as a decorator, a function) as a span of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def propagate_var(var):
+    """Also hand var's value over to functions wrapped with propagate()"""
+    _propagated.append(var)
+
+
+def propagate(fn):
+    """Wrap fn so that on an executor thread it still counts toward the submitting request
+
+    Spans it records go to that request's timings, and other registered request-scoped
+    variables (e.g. the rate limiter's caller) keep their values.
+    """
+    values = [(var, var.get()) for var in _propagated]
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        tokens = [(var, var.set(value)) for var, value in values]
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+    return wrapper
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with jsonify() serialization recorded as a span"""
+
+    def dumps(self, obj, **kwargs):
+        with span('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def install_request_timing(app):
+    """Start a timing record per request, emit Server-Timing and log the spans at teardown"""
+    from flask import request, before_render_template, template_rendered
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_request_timing():
+        _current.set(RequestTimings())
+
+    @app.after_request
+    def _add_server_timing(response):
+        timings = _current.get()
+        if timings is not None and SERVER_TIMING:
+            # Streamed bodies are still running here; their spans only reach the log line
+            response.headers['Server-Timing'] = timings.server_timing()
+        if timings is not None:
+            timings.status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _log_request_timing(exc):
+        # Runs after the last chunk for stream_with_context responses
+        timings = _current.get()
+        if timings is None:
+            return
+        _current.set(None)
+        if REQUEST_LOG:
+            logger.info(json.dumps({
+                "event": "request",
+                "method": request.method,
+                "route": request.url_rule.rule if request.url_rule else None,
+                "path": request.path,
+                "status": timings.status or 500,
+                "duration_ms": round(timings.elapsed() * 1000, 2),
+                "spans": timings.as_dict(),
+                "pid": os.getpid(),
+            }))
+
+    def _template_started(sender, template, context, **extra):
+        _render_started.set(time.perf_counter())
+
+    def _template_finished(sender, template, context, **extra):
+        started = _render_started.get()
+        if started is not None:
+            record('template', time.perf_counter() - started)
+            _render_started.set(None)
+
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+
+
+def install_commit_timing(session):
+    """Record session commits (flush plus COMMIT) as the commit span"""
+    from sqlalchemy import event
+
+    started = threading.local()
+
+    @event.listens_for(session, "before_commit")
+    def _before_commit(sess):
+        started.value = time.perf_counter()
+
+    @event.listens_for(session, "after_commit")
+    def _after_commit(sess):
+        if getattr(started, 'value', None) is not None:
+            record('commit', time.perf_counter() - started.value)
+            started.value = None
@@ -0,0 +1,155 @@
+"""Tail-latency and failure handling for upstream calls: circuit breaker, latency tracking, hedging"""
+import os
+import time
+import queue
+import threading
+from collections import deque
+
+try:
+    from gevent import spawn as _gevent_spawn
+    from gevent.monkey import is_module_patched
+except ImportError:
+    _gevent_spawn = None
+
+    def is_module_patched(name):
+        return False
+
+# Consecutive failed calls that open a model's circuit, and how long it then stays open
+BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", "30"))
+# Successful call latencies kept per prompt kind for the p95 hedge delay
+LATENCY_WINDOW = int(os.getenv("GEMINI_LATENCY_WINDOW", "200"))
+LATENCY_MIN_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """Fails fast while an upstream keeps failing, then lets a single probe through
+
+    closed: calls go out; BREAKER_FAILURES consecutive failures open the circuit.
+    open: calls are refused until reset_timeout has passed.
+    half_open: one probe call goes out; its success closes the circuit, its failure reopens it.
+    The state is per worker process: each one notices a dead upstream after a few calls.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go out now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def retry_after(self):
+        """Seconds until the circuit lets a probe through"""
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self):
+        """The call ended without saying anything about upstream health (e.g. our own quota)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures,
+                    "retry_after": round(self.retry_after(), 1) if self.state != 'closed' else 0}
+
+
+class LatencyTracker:
+    """Recent successful call latencies per key, for percentile-based hedge delays"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key, seconds):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key, pct):
+        """The pct-th percentile, or None until LATENCY_MIN_SAMPLES calls have been seen"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def _spawn(fn):
+    """Start fn concurrently; returns a cancel function for it"""
+    if _gevent_spawn is not None and is_module_patched('threading'):
+        greenlet = _gevent_spawn(fn)
+        # Killing the greenlet aborts its socket read and discards the connection
+        return lambda: greenlet.kill(block=False)
+    thread = threading.Thread(target=fn, daemon=True)
+    thread.start()
+    # A thread cannot be interrupted; its late result is simply dropped
+    return lambda: None
+
+
+def hedged_call(primary, hedge, delay):
+    """Run primary(); if it is still running after delay seconds, also run hedge()
+
+    Returns (winner, value) for the first attempt that succeeds, winner being 'primary' or
+    'hedge', and cancels the other one. If both fail, the primary's error is raised.
+    """
+    results = queue.Queue()
+
+    def run(label, fn):
+        def target():
+            try:
+                results.put((label, fn(), None))
+            except BaseException as e:
+                results.put((label, None, e))
+                if not isinstance(e, Exception):
+                    raise
+        return target
+
+    cancels = {'primary': _spawn(run('primary', primary))}
+    try:
+        label, value, error = results.get(timeout=delay)
+    except queue.Empty:
+        cancels['hedge'] = _spawn(run('hedge', hedge))
+    else:
+        if error is not None:
+            raise error
+        return label, value
+
+    errors = {}
+    while len(errors) < len(cancels):
+        label, value, error = results.get()
+        if error is None:
+            for other, cancel in cancels.items():
+                if other != label:
+                    cancel()
+            return label, value
+        errors[label] = error
+    raise errors['primary']
@@ -0,0 +1,222 @@
+"""On-demand sampling profiler producing folded stacks for flame graphs
+
+A SIGPROF interval timer fires only while a sampled request is running and only counts
+CPU time, so waiting on Gemini or the database costs nothing; those waits are already
+visible as Server-Timing spans. Each sample records the interrupted stack, root first, in
+the "frame;frame;frame count" format read by flamegraph.pl and speedscope.
+
+The on/off switch is a small JSON file in PROFILE_DIR that every worker re-reads at most
+once a second, and each worker writes its samples to PROFILE_DIR/<pid>.folded, so a
+switch flipped on one worker applies to all of them and the dump covers all of them.
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import tempfile
+import threading
+from collections import Counter
+
+try:
+    from gevent.monkey import get_original
+    # Real OS thread ids, also under gevent where threading.get_ident() is per greenlet
+    _thread_ident = get_original('_thread', 'get_ident')
+except ImportError:
+    _thread_ident = threading.get_ident
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "munazara-profile"))
+# Share of requests sampled when profiling is switched on without an explicit rate
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.05"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_DEPTH = 64
+# Seconds between re-reads of the control file and between flushes of the sample file
+SYNC_INTERVAL = 1.0
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+def fold(frame):
+    """A frame's stack as one folded line, root first"""
+    names = []
+    while frame is not None and len(names) < PROFILE_MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads serving selected requests on a CPU-time interval timer"""
+
+    def __init__(self, directory=PROFILE_DIR):
+        self.directory = directory
+        self.control_path = os.path.join(directory, 'control.json')
+        self.enabled = False
+        self.sample_rate = PROFILE_SAMPLE_RATE
+        self.interval = PROFILE_INTERVAL_MS / 1000
+        self.samples = Counter()
+        self.installed = False
+        self._main_ident = None
+        self._active = Counter()
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._flushed_at = 0.0
+        self._control_mtime = None
+
+    def install(self):
+        """Register the SIGPROF handler; must run on the main thread (app startup)"""
+        if not hasattr(signal, 'setitimer'):
+            return False
+        try:
+            signal.signal(signal.SIGPROF, self._on_signal)
+        except ValueError:
+            # Not the main thread: the profiler stays unavailable in this process
+            return False
+        self.installed = True
+        self._main_ident = _thread_ident()
+        self.sync(force=True)
+        return True
+
+    def _on_signal(self, signum, frame):
+        # The handler runs on the main thread; frame is what it was doing (any greenlet under gevent)
+        frames = None
+        for ident in list(self._active):
+            if ident == self._main_ident:
+                stack = frame
+            else:
+                if frames is None:
+                    frames = sys._current_frames()
+                stack = frames.get(ident)
+            if stack is not None:
+                self.samples[fold(stack)] += 1
+
+    # ---- switch shared through PROFILE_DIR ----
+
+    def configure(self, enabled, sample_rate=None, interval_ms=None, reset=False):
+        """Write the switch for all workers; reset also drops the samples collected so far"""
+        os.makedirs(self.directory, exist_ok=True)
+        control = {
+            "enabled": bool(enabled),
+            "sample_rate": self.sample_rate if sample_rate is None else min(max(float(sample_rate), 0.0), 1.0),
+            "interval_ms": self.interval * 1000 if interval_ms is None else max(float(interval_ms), 1.0),
+        }
+        if reset:
+            for name in os.listdir(self.directory):
+                if name.endswith('.folded'):
+                    os.remove(os.path.join(self.directory, name))
+            control["reset_at"] = time.time()
+        tmp_path = f"{self.control_path}.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(control, f)
+        os.replace(tmp_path, self.control_path)
+        self.sync(force=True)
+        return self.status()
+
+    def sync(self, force=False):
+        """Pick up switch changes and flush this worker's samples, at most once per SYNC_INTERVAL"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < SYNC_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.control_path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._control_mtime:
+            self._control_mtime = mtime
+            control = {}
+            if mtime is not None:
+                try:
+                    with open(self.control_path) as f:
+                        control = json.load(f)
+                except (OSError, ValueError):
+                    control = {}
+            self.enabled = bool(control.get("enabled"))
+            self.sample_rate = control.get("sample_rate", PROFILE_SAMPLE_RATE)
+            self.interval = control.get("interval_ms", PROFILE_INTERVAL_MS) / 1000
+            if control.get("reset_at"):
+                self.samples.clear()
+        if self.samples and (force or now - self._flushed_at >= SYNC_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.folded")
+        with open(f"{path}.tmp", 'w') as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in list(self.samples.items()))
+        os.replace(f"{path}.tmp", path)
+
+    # ---- per request ----
+
+    def start(self):
+        """Begin sampling the current thread if this request is picked; returns a token for stop()"""
+        self.sync()
+        if not (self.installed and self.enabled and random.random() < self.sample_rate):
+            return None
+        ident = _thread_ident()
+        with self._lock:
+            self._active[ident] += 1
+            if sum(self._active.values()) == 1:
+                signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return ident
+
+    def stop(self, ident):
+        with self._lock:
+            self._active[ident] -= 1
+            if self._active[ident] <= 0:
+                del self._active[ident]
+            if not self._active:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+
+    # ---- output ----
+
+    def folded(self):
+        """Folded stacks summed over every worker's sample file"""
+        self.sync(force=True)
+        total = Counter()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if not name.endswith('.folded'):
+                    continue
+                with open(os.path.join(self.directory, name)) as f:
+                    for line in f:
+                        stack, _, count = line.rstrip('\n').rpartition(' ')
+                        if stack:
+                            total[stack] += int(count)
+        return ''.join(f"{stack} {count}\n" for stack, count in total.most_common())
+
+    def status(self):
+        return {
+            "available": self.installed,
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": sum(self.samples.values()),
+            "pid": os.getpid(),
+        }
+
+
+profiler = SamplingProfiler()
+
+
+def install_request_sampling(app, sampler=profiler):
+    """Sample a share of requests while profiling is switched on"""
+    from flask import g
+
+    sampler.install()
+
+    @app.before_request
+    def _start_sampling():
+        g.profile_token = sampler.start()
+
+    @app.teardown_request
+    def _stop_sampling(exc):
+        token = g.pop('profile_token', None)
+        if token is not None:
+            sampler.stop(token)
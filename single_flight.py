@@ -0,0 +1,139 @@
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+
+from llm_cache import CACHE_DB
+
+logger = logging.getLogger(__name__)
+
+# The lock table lives next to the response cache so every worker on the host sees it
+LOCK_DB = os.getenv("SINGLE_FLIGHT_DB", CACHE_DB)
+# A lock older than this is treated as abandoned by a crashed worker
+LOCK_LEASE = float(os.getenv("SINGLE_FLIGHT_LEASE", "90"))
+POLL_INTERVAL = float(os.getenv("SINGLE_FLIGHT_POLL", "0.2"))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per logical key at a time and shares its outcome with concurrent callers
+
+    Threads of the same worker wait on the leader and receive its result (or exception).
+    Other workers are held off by a row in the llm_flight lock table; once it is released
+    they call load() - typically a response cache read - and only run the call themselves
+    when that finds nothing.
+    """
+
+    def __init__(self, path=LOCK_DB, lease=LOCK_LEASE, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"leaders": 0, "local_waits": 0, "remote_waits": 0, "remote_hits": 0}
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_flight ("
+                         "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _try_lock(self, key, owner):
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute("DELETE FROM llm_flight WHERE key = ? AND expires_at <= ?", (key, now))
+            return conn.execute("INSERT OR IGNORE INTO llm_flight (key, owner, expires_at) VALUES (?, ?, ?)",
+                                (key, owner, now + self.lease)).rowcount == 1
+        except sqlite3.Error as e:
+            # Without the lock table we still coalesce within this worker
+            logger.warning("Single-flight lock failed: %s", e)
+            return True
+
+    def _unlock(self, key, owner):
+        try:
+            self._connection().execute("DELETE FROM llm_flight WHERE key = ? AND owner = ?", (key, owner))
+        except sqlite3.Error as e:
+            logger.warning("Single-flight unlock failed: %s", e)
+
+    def _locked(self, key):
+        try:
+            return self._connection().execute(
+                "SELECT 1 FROM llm_flight WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone() is not None
+        except sqlite3.Error:
+            return False
+
+    def do(self, key, fn, load=None):
+        """Return fn() for key, unless an identical call is already running somewhere"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["leaders"] += 1
+            else:
+                self.stats["local_waits"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._lead(key, fn, load)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _lead(self, key, fn, load):
+        owner = uuid.uuid4().hex
+        waited = False
+        while not self._try_lock(key, owner):
+            if not waited:
+                waited = True
+                self._count("remote_waits")
+            while self._locked(key):
+                time.sleep(self.poll_interval)
+            if load is not None:
+                value = load()
+                if value is not None:
+                    self._count("remote_hits")
+                    return value
+
+        try:
+            return fn()
+        finally:
+            self._unlock(key, owner)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+single_flight = SingleFlight()
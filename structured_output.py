@@ -0,0 +1,118 @@
+"""Gemini responseSchema definitions and a validator for the JSON they describe
+
+The schemas use Gemini's OpenAPI subset, so the same dict is sent as
+generationConfig.responseSchema and used to check what comes back.
+"""
+import os
+
+# Total attempts for a JSON generation; only invalid output is retried
+STRUCTURED_OUTPUT_ATTEMPTS = int(os.getenv("STRUCTURED_OUTPUT_ATTEMPTS", "3"))
+
+DIFFICULTY_LEVELS = ['beginner', 'entry', 'mid', 'senior', 'master']
+
+
+class SchemaValidationError(ValueError):
+    """Raised when generated JSON does not match its response schema"""
+
+
+def _string():
+    return {"type": "STRING"}
+
+
+def _object(properties, required=None):
+    return {"type": "OBJECT", "properties": properties, "required": required or list(properties)}
+
+
+REPORT_SCHEMA = _object({
+    "enGucluArguman": _string(),
+    "gelistirilmesiGerekenNokta": _object({
+        "tespitEdilenHataTuru": _string(),
+        "hataTanimi": _string(),
+        "ornekCumle": _string(),
+        "onerilenGelistirme": _string(),
+    }),
+    "kanitKullanimi": _string(),
+    "iknaEdicilikPuani": {"type": "INTEGER", "minimum": 1, "maximum": 10},
+    "genelYorum": _string(),
+})
+
+QUIZ_SCHEMA = _object({
+    "questions": {
+        "type": "ARRAY",
+        "minItems": 1,
+        "items": _object({
+            "question": _string(),
+            "options": {"type": "ARRAY", "items": _string(), "minItems": 4, "maxItems": 4},
+            "correct": {"type": "INTEGER", "minimum": 0, "maximum": 3},
+            "difficulty": {"type": "STRING", "format": "enum", "enum": DIFFICULTY_LEVELS},
+            "explanation": _string(),
+        }, required=["question", "options", "correct", "explanation"]),
+    },
+})
+
+_PROJECT = _object({"title": _string(), "description": _string()})
+
+ROADMAP_SCHEMA = _object({
+    "title": _string(),
+    "sections": {
+        "type": "ARRAY",
+        "minItems": 1,
+        "items": _object({
+            "title": _string(),
+            "description": _string(),
+            "tasks": {"type": "ARRAY", "items": _string(), "minItems": 1},
+        }),
+    },
+    "projects": _object({"micro": _PROJECT, "main": _PROJECT}),
+})
+
+PROFILE_SCHEMA = _object({
+    "enSikHata": _object({"hataTuru": _string(), "tavsiye": _string()}),
+    "munazaraStili": _string(),
+    "gucluYon": _string(),
+    "gelistirilecekYon": _string(),
+})
+
+
+def response_config(schema, generation_config=None):
+    """generationConfig asking Gemini for JSON that follows the schema"""
+    return dict(generation_config or {}, responseMimeType="application/json", responseSchema=schema)
+
+
+def validate(value, schema, path="$"):
+    """Check a decoded JSON value against a response schema; raises SchemaValidationError"""
+    kind = schema.get("type")
+    if value is None:
+        if schema.get("nullable"):
+            return
+        raise SchemaValidationError(f"{path}: değer eksik")
+
+    if kind == "OBJECT":
+        if not isinstance(value, dict):
+            raise SchemaValidationError(f"{path}: nesne bekleniyordu")
+        for name in schema.get("required", []):
+            if name not in value:
+                raise SchemaValidationError(f"{path}.{name}: zorunlu alan eksik")
+        for name, child in schema.get("properties", {}).items():
+            if name in value:
+                validate(value[name], child, f"{path}.{name}")
+    elif kind == "ARRAY":
+        if not isinstance(value, list):
+            raise SchemaValidationError(f"{path}: dizi bekleniyordu")
+        if len(value) < schema.get("minItems", 0) or len(value) > schema.get("maxItems", len(value)):
+            raise SchemaValidationError(f"{path}: eleman sayısı geçersiz ({len(value)})")
+        for i, item in enumerate(value):
+            validate(item, schema["items"], f"{path}[{i}]")
+    elif kind == "STRING":
+        if not isinstance(value, str):
+            raise SchemaValidationError(f"{path}: metin bekleniyordu")
+        if "enum" in schema and value not in schema["enum"]:
+            raise SchemaValidationError(f"{path}: geçersiz değer {value!r}")
+    elif kind in ("INTEGER", "NUMBER"):
+        numeric = (int,) if kind == "INTEGER" else (int, float)
+        if isinstance(value, bool) or not isinstance(value, numeric):
+            raise SchemaValidationError(f"{path}: sayı bekleniyordu")
+        if value < schema.get("minimum", value) or value > schema.get("maximum", value):
+            raise SchemaValidationError(f"{path}: aralık dışında ({value})")
+    elif kind == "BOOLEAN" and not isinstance(value, bool):
+        raise SchemaValidationError(f"{path}: mantıksal değer bekleniyordu")
@@ -0,0 +1,71 @@
+import os
+import sys
+import uuid
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings are read at import time, so point everything at a scratch directory first
+_scratch = tempfile.mkdtemp(prefix='munazara-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ['LLM_CACHE_DB'] = os.path.join(_scratch, 'llm_cache.db')
+os.environ['PROFILE_DIR'] = os.path.join(_scratch, 'profile')
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+os.environ['REQUEST_LOG'] = '0'
+os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+import app as app_module  # noqa: E402
+
+REPORT = {
+    "enGucluArguman": "Veriler olumlu.",
+    "gelistirilmesiGerekenNokta": {"tespitEdilenHataTuru": "Genelleme", "hataTanimi": "Tek örnek.",
+                                   "ornekCumle": "Bu görüşü destekliyorum.", "onerilenGelistirme": "Kaynak göster."},
+    "kanitKullanimi": "Orta",
+    "iknaEdicilikPuani": 7,
+    "genelYorum": "İyi.",
+}
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = app_module.create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        app_module.upgrade_database()
+        app_module.init_sample_data()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(client):
+    """A freshly registered user, logged in on client"""
+    credentials = {'username': f"test-{uuid.uuid4().hex[:12]}", 'password': 'test-password'}
+    assert client.post('/api/register', json=credentials).status_code == 201
+    assert client.post('/api/login', json=credentials).status_code == 200
+    return credentials['username']
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Canned Gemini answers: the report for structured calls, a reply or mermaid map for text"""
+    calls = []
+
+    def generate(prompt, *args, kind='other', **kwargs):
+        calls.append(kind)
+        return "graph TD; A-->B" if kind == 'schema' else "Karşı argüman."
+
+    def generate_json(prompt, schema, *args, kind='other', **kwargs):
+        calls.append(kind)
+        return {key: (dict(value) if isinstance(value, dict) else value) for key, value in REPORT.items()}
+
+    monkeypatch.setattr(app_module.gemini, 'generate', generate)
+    monkeypatch.setattr(app_module.gemini, 'generate_json', generate_json)
+    return calls
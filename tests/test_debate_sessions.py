@@ -0,0 +1,72 @@
+from app import gemini
+from database import db
+from gemini_client import GeminiUnavailableError
+from models import Debate, User, UserStats
+from test_jobs import start_debate
+
+
+def user_debates(app, username):
+    with app.app_context():
+        user = User.query.filter_by(username=username).one()
+        stats = db.session.get(UserStats, user.id)
+        return Debate.query.filter_by(user_id=user.id).count(), stats.debate_count if stats else 0
+
+
+def test_finalize_twice_stores_one_debate(app, client, user, fake_gemini):
+    session_id = start_debate(client)
+
+    assert client.post(f'/api/debate/sessions/{session_id}/finalize').status_code == 200
+    again = client.post(f'/api/debate/sessions/{session_id}/finalize')
+
+    assert again.status_code == 409
+    assert user_debates(app, user) == (1, 1)
+
+
+def test_failed_finalize_leaves_session_open(app, client, user, fake_gemini, monkeypatch):
+    session_id = start_debate(client)
+
+    def unavailable(*args, **kwargs):
+        raise GeminiUnavailableError("Gemini şu anda yanıt veremiyor.", retry_after=2)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(gemini, 'generate_json', unavailable)
+        failed = client.post(f'/api/debate/sessions/{session_id}/finalize')
+    assert failed.status_code == 503
+    assert client.get(f'/api/debate/sessions/{session_id}').get_json()['finalized'] is False
+
+    # The debate can go on and still be scored afterwards
+    assert client.post(f'/api/debate/sessions/{session_id}/turns', json={'text': 'Yeni bir argüman.'}).status_code == 200
+    assert client.post(f'/api/debate/sessions/{session_id}/finalize').status_code == 200
+    assert client.get(f'/api/debate/sessions/{session_id}').get_json()['finalized'] is True
+    assert user_debates(app, user) == (1, 1)
+
+
+def unavailable_stream(*args, **kwargs):
+    raise GeminiUnavailableError("Gemini şu anda yanıt veremiyor.", retry_after=2)
+    yield
+
+
+def test_failed_turn_stores_nothing(client, user, fake_gemini, monkeypatch):
+    session_id = start_debate(client)
+
+    def unavailable(*args, **kwargs):
+        raise GeminiUnavailableError("Gemini şu anda yanıt veremiyor.", retry_after=2)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(gemini, 'generate', unavailable)
+        patch.setattr(gemini, 'stream_generate', unavailable_stream)
+        failed = client.post(f'/api/debate/sessions/{session_id}/turns', json={'text': 'İkinci argüman.'})
+        streamed = client.post(f'/api/debate/sessions/{session_id}/turns/stream', json={'text': 'İkinci argüman.'})
+        assert b'event: error' in streamed.get_data()
+    assert failed.status_code == 503
+
+    # The retry answers the same message once, keeping user/ai alternation intact
+    prompts = []
+    generate = gemini.generate
+    monkeypatch.setattr(gemini, 'generate', lambda prompt, *args, **kwargs: prompts.append(prompt) or generate(
+        prompt, *args, **kwargs))
+    assert client.post(f'/api/debate/sessions/{session_id}/turns', json={'text': 'İkinci argüman.'}).status_code == 200
+    assert prompts[0].count('User: İkinci argüman.') == 1
+    messages = client.get(f'/api/debate/sessions/{session_id}').get_json()['messages']
+    assert [m['author'] for m in messages] == ['user', 'ai', 'user', 'ai']
+    assert messages[2]['text'] == 'İkinci argüman.'
@@ -0,0 +1,22 @@
+import pytest
+import requests
+
+import gemini_client
+from gemini_client import GeminiClient, GeminiUnavailableError
+
+
+def test_read_timeouts_are_retried_then_reported_unavailable(monkeypatch):
+    client = GeminiClient(api_key='test', max_retries=2, hedge_after='0')
+    attempts = []
+
+    def post(*args, **kwargs):
+        attempts.append(kwargs['timeout'])
+        raise requests.ReadTimeout("read timed out")
+
+    monkeypatch.setattr(client.session, 'post', post)
+    monkeypatch.setattr(gemini_client, 'BACKOFF_BASE', 0)
+
+    with pytest.raises(GeminiUnavailableError):
+        client.generate("Merhaba", kind='other')
+
+    assert len(attempts) == 3
@@ -0,0 +1,73 @@
+import time
+
+import app as app_module
+import rate_limiter
+
+
+def start_debate(client):
+    created = client.post('/api/debate/sessions', json={'topic': 'Uzaktan çalışma verimlidir',
+                                                        'stance': 'savunuyorum', 'lang': 'tr'})
+    assert created.status_code == 201
+    session_id = created.get_json()['id']
+    assert client.post(f'/api/debate/sessions/{session_id}/turns',
+                       json={'text': 'Bu görüşü destekliyorum.'}).status_code == 200
+    return session_id
+
+
+def wait_for_job(client, status_url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job still {job['status']} after {timeout} s")
+
+
+def test_respond_async_finalize_returns_job_links(client, user, fake_gemini):
+    session_id = start_debate(client)
+
+    response = client.post(f'/api/debate/sessions/{session_id}/finalize', headers={'Prefer': 'respond-async'})
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['status'] == 'queued'
+    assert body['status_url'] == f"/api/jobs/{body['job_id']}"
+    assert body['events_url'] == f"/api/jobs/{body['job_id']}/events"
+    assert response.headers['Location'] == body['status_url']
+
+    job = wait_for_job(client, body['status_url'])
+    assert job['status'] == 'done', job
+    assert job['result']['report']['iknaEdicilikPuani'] == 7
+    assert job['result']['schema'] == {'schema': 'graph TD; A-->B'}
+
+    events = client.get(body['events_url']).get_data(as_text=True)
+    assert 'event: done' in events
+
+
+def test_finalize_without_prefer_answers_inline(client, user, fake_gemini):
+    session_id = start_debate(client)
+
+    response = client.post(f'/api/debate/sessions/{session_id}/finalize')
+
+    assert response.status_code == 200
+    assert response.get_json()['report']['iknaEdicilikPuani'] == 7
+
+
+def test_async_job_is_charged_to_the_submitting_user(app, client, user, fake_gemini, monkeypatch):
+    callers = []
+    generate_json = app_module.gemini.generate_json
+
+    def charged(*args, **kwargs):
+        callers.append(rate_limiter.current_caller())
+        return generate_json(*args, **kwargs)
+
+    monkeypatch.setattr(app_module.gemini, 'generate_json', charged)
+    session_id = start_debate(client)
+
+    response = client.post(f'/api/debate/sessions/{session_id}/finalize', headers={'Prefer': 'respond-async'})
+    assert wait_for_job(client, response.get_json()['status_url'])['status'] == 'done'
+
+    with app.app_context():
+        user_id = app_module.user_by_name_query(user).first().id
+    assert callers == [f"user:{user_id}"]
@@ -0,0 +1,22 @@
+import sqlite3
+
+from llm_cache import LLMCache
+
+
+def disk_keys(path):
+    with sqlite3.connect(path) as conn:
+        return {key for (key,) in conn.execute("SELECT key FROM llm_cache")}
+
+
+def test_writes_periodically_purge_expired_rows(tmp_path):
+    path = str(tmp_path / 'llm_cache.db')
+    cache = LLMCache(path=path, ttl=-1, purge_every=3)
+
+    cache.set('a', 'old')
+    cache.set('b', 'old')
+    assert disk_keys(path) == {'a', 'b'}
+
+    cache.ttl = 60
+    cache.set('c', 'fresh')
+
+    assert disk_keys(path) == {'c'}
@@ -0,0 +1,49 @@
+import uuid
+
+import app as app_module
+
+
+def register(client, password='test-password'):
+    credentials = {'username': f"test-{uuid.uuid4().hex[:12]}", 'password': password}
+    assert client.post('/api/register', json=credentials).status_code == 201
+    return credentials
+
+
+def login(client, ip, username, password):
+    return client.post('/api/login', json={'username': username, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_successful_login_does_not_reset_the_ip_counter(client):
+    victim = register(client)
+    own = register(client)
+    ip = f"10.0.{uuid.uuid4().int % 250}.{uuid.uuid4().int % 250}"
+
+    for _ in range(app_module.LOGIN_MAX_FAILURES - 1):
+        assert login(client, ip, victim['username'], 'guess').status_code == 401
+    assert login(client, ip, own['username'], own['password']).status_code == 200
+
+    assert login(client, ip, victim['username'], 'guess').status_code == 401
+    assert login(client, ip, victim['username'], victim['password']).status_code == 429
+
+
+def test_failures_are_counted_in_the_stored_row(app, client):
+    user = register(client)
+    ip = f"10.1.{uuid.uuid4().int % 250}.{uuid.uuid4().int % 250}"
+
+    for _ in range(3):
+        login(client, ip, user['username'], 'guess')
+
+    with app.app_context():
+        throttle = app_module.db.session.get(app_module.LoginThrottle, ip)
+        assert throttle.failures == 3
+        assert throttle.blocked_until is None
+
+        # An expired window starts over instead of adding to the old count
+        throttle.window_started_at -= app_module.timedelta(seconds=app_module.LOGIN_FAILURE_WINDOW + 1)
+        app_module.db.session.commit()
+
+    login(client, ip, user['username'], 'guess')
+    with app.app_context():
+        throttle = app_module.db.session.get(app_module.LoginThrottle, ip)
+        assert throttle.failures == 1
@@ -0,0 +1,78 @@
+import os
+import json
+import sys
+import shutil
+import subprocess
+
+import sqlalchemy as sa
+
+from conftest import ROOT
+
+LEGACY_DB = os.path.join(ROOT, 'instance', 'debate_arena.db')
+
+
+def describe(url):
+    """Columns, indexes, foreign keys and primary key of every application table"""
+    inspector = sa.inspect(sa.create_engine(url))
+    schema = {}
+    for table in inspector.get_table_names():
+        if table in ('alembic_version', 'quiz_question'):
+            # Bookkeeping, and a pre-roadmap leftover nothing reads
+            continue
+        schema[table] = (
+            sorted((c['name'], str(c['type']), c['nullable']) for c in inspector.get_columns(table)),
+            sorted((i['name'], tuple(i['column_names']), bool(i['unique'])) for i in inspector.get_indexes(table)),
+            sorted((tuple(f['constrained_columns']), f['referred_table']) for f in inspector.get_foreign_keys(table)),
+            inspector.get_pk_constraint(table)['constrained_columns'],
+        )
+    return schema
+
+
+def init_db(url):
+    env = dict(os.environ, DATABASE_URL=url, FLASK_APP='app.py')
+    subprocess.run([sys.executable, '-m', 'flask', 'init-db'], cwd=ROOT, env=env, check=True,
+                   capture_output=True)
+
+
+def test_init_db_migrates_a_legacy_database_to_the_model_schema(app, tmp_path):
+    legacy = tmp_path / 'legacy.db'
+    shutil.copy(LEGACY_DB, legacy)
+
+    init_db(f"sqlite:///{legacy}")
+
+    assert describe(f"sqlite:///{legacy}") == describe(os.environ['DATABASE_URL'])
+
+
+def test_init_db_is_repeatable(app, tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+
+    init_db(url)
+    init_db(url)
+
+    assert describe(url) == describe(os.environ['DATABASE_URL'])
+
+
+def flask_db(url, *args):
+    env = dict(os.environ, DATABASE_URL=url, FLASK_APP='app.py')
+    subprocess.run([sys.executable, '-m', 'flask', 'db', *args], cwd=ROOT, env=env, check=True,
+                   capture_output=True)
+
+
+def test_upgrade_seeds_task_progress_of_existing_paths(tmp_path):
+    url = f"sqlite:///{tmp_path / 'paths.db'}"
+    init_db(url)
+    flask_db(url, 'stamp', '6a636df1a252')
+    roadmap = {'sections': [{'tasks': ['a', 'b']}, {'tasks': ['c']}]}
+    engine = sa.create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO user (id, username, password_hash) VALUES (1, 'eski', 'x')"))
+        conn.execute(sa.text("INSERT INTO learning_path (id, user_id, topic_id, roadmap_data, progress, timestamp) "
+                             "VALUES (1, 1, 1, :roadmap, :progress, '2024-01-01 00:00:00')"),
+                     {'roadmap': json.dumps(roadmap), 'progress': json.dumps({'0': {'1': True}})})
+
+    flask_db(url, 'upgrade')
+
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT section_index, task_index, completed FROM task_progress "
+                                    "ORDER BY section_index, task_index")).fetchall()
+    assert [tuple(row) for row in rows] == [(0, 0, 0), (0, 1, 1), (1, 0, 0)]
@@ -0,0 +1,19 @@
+import time
+
+import pytest
+
+from password_hashing import HashPoolBusyError, PasswordHasher
+
+
+def slow_hash(seconds):
+    time.sleep(seconds)
+    return 'hash'
+
+
+def test_timed_out_hash_reports_the_pool_busy():
+    hasher = PasswordHasher(workers=1, timeout=0.05)
+    try:
+        with pytest.raises(HashPoolBusyError):
+            hasher._run(slow_hash, 1)
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,21 @@
+import app as app_module
+from app import db
+
+
+def test_lookups_use_their_index(app):
+    with app.app_context(), db.engine.connect() as conn:
+        regressions = {}
+        for name, index, query, sorts in app_module.query_plan_checks():
+            plan = app_module.explain_query_plan(conn, query)
+            problems = app_module.query_plan_problems(plan, index, sorts)
+            if problems:
+                regressions[name] = (problems, plan)
+
+    assert regressions == {}
+
+
+def test_check_query_plans_command_passes(app):
+    result = app.test_cli_runner().invoke(app_module.check_query_plans)
+
+    assert result.exit_code == 0, result.output
+    assert '❌' not in result.output
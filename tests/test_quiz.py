@@ -0,0 +1,40 @@
+import itertools
+
+import app as app_module
+from app import gemini
+from gemini_client import GeminiUnavailableError
+
+
+def topic_ids(app):
+    with app.app_context():
+        return [topic.id for topic in app_module.LearningTopic.query.order_by(app_module.LearningTopic.id)]
+
+
+def test_cold_topic_is_filled_before_the_first_quiz(app, client, monkeypatch):
+    counter = itertools.count()
+
+    def questions(prompt, schema, *args, **kwargs):
+        return {'questions': [{'question': f"Soru {next(counter)}?", 'options': ['A', 'B', 'C', 'D'],
+                               'correct': 'A', 'explanation': ''}
+                              for _ in range(app_module.QUESTION_POOL_REFILL_BATCH)]}
+
+    monkeypatch.setattr(gemini, 'generate_json', questions)
+    # Fill each pool past the watermark, so no background refill outlives the fake
+    monkeypatch.setattr(app_module, 'QUESTION_POOL_REFILL_BATCH', app_module.QUESTION_POOL_LOW_WATERMARK)
+    response = client.post(f'/api/quiz/{topic_ids(app)[-1]}', json={'lang': 'tr'})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['questions']) == app_module.QUIZ_SIZE
+    assert 'refilling' not in body
+
+
+def test_cold_topic_without_gemini_is_unavailable(app, client, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise GeminiUnavailableError("Gemini şu anda yanıt veremiyor.", retry_after=2)
+
+    monkeypatch.setattr(gemini, 'generate_json', unavailable)
+    response = client.post(f'/api/quiz/{topic_ids(app)[-2]}', json={'lang': 'tr'})
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
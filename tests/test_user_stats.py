@@ -0,0 +1,49 @@
+import json
+import threading
+
+import app as app_module
+from app import db
+from conftest import REPORT
+from test_jobs import start_debate
+
+
+def test_concurrent_debates_all_reach_the_stats(app, client, user):
+    with app.app_context():
+        user_id = app_module.user_by_name_query(user).first().id
+    workers, rounds = 6, 5
+    start = threading.Barrier(workers)
+    errors = []
+
+    def finalize():
+        with app.app_context():
+            try:
+                start.wait()
+                for _ in range(rounds):
+                    app_module.save_debate(user_id, 'Uzaktan çalışma verimlidir', dict(REPORT), "graph TD; A-->B")
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=finalize) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        stats = db.session.get(app_module.UserStats, user_id)
+        assert stats.debate_count == workers * rounds
+        assert stats.score_sum == workers * rounds * REPORT['iknaEdicilikPuani']
+        assert json.loads(stats.score_histogram) == {str(REPORT['iknaEdicilikPuani']): workers * rounds}
+        assert sum(json.loads(stats.fallacy_histogram).values()) == workers * rounds
+
+
+def test_profile_charts_every_score(client, user, fake_gemini):
+    for _ in range(3):
+        session_id = start_debate(client)
+        assert client.post(f'/api/debate/sessions/{session_id}/finalize').status_code == 200
+
+    for _ in range(2):  # generated, then served from the stored profile
+        response = client.get('/api/profile?lang=tr')
+        assert response.status_code == 200
+        assert response.get_json()['scores'] == [REPORT['iknaEdicilikPuani']] * 3